@@ -654,6 +654,7 @@ class ShardAnalyzer:
                 if (shard.table_name == recommendation.table_name and
                     shard.schema_name == recommendation.schema_name and
                     shard.shard_id == recommendation.shard_id and
+                    shard.partition_ident == recommendation.partition_ident and
                     shard.node_name == recommendation.from_node):
                     source_shard = shard
                     break
@@ -12,6 +12,7 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
+from .. import messages
 from ..database import CrateDBClient
 from ..formatting import ConsoleFormatter, RichTableFormatter, ProgressFormatter
 
@@ -27,17 +28,18 @@ class BaseCommand(ABC):
     - Common utility methods
     """
     
-    def __init__(self, client: CrateDBClient):
+    def __init__(self, client: CrateDBClient, console: Optional[Console] = None):
         """
         Initialize the base command.
         
         Args:
             client: CrateDB client instance for database operations
+            console: Console to write output to, a new Rich console if omitted
         """
         self.client = client
-        self.console = Console()
+        self.console = console or Console()
         self.formatter = ConsoleFormatter(self.console)
-        self.table_formatter = RichTableFormatter()
+        self.table_formatter = RichTableFormatter(self.console)
         self.progress_formatter = ProgressFormatter(self.console)
     
     @abstractmethod
@@ -96,6 +98,24 @@ class BaseCommand(ABC):
             self.console.print(f"[dim]{subtitle}[/dim]")
         self.console.print()
     
+    def print_lines(self, lines: List[str], **kwargs) -> None:
+        """
+        Print several lines of markup with a single console call.
+        
+        Rich parses markup and renders every print call separately, so sections
+        made of many short lines are printed in one go.
+        
+        The lines are joined into one markup string, so values interpolated into
+        them must be escaped with ``rich.markup.escape``, or a stray ``[`` would
+        break the whole section.
+        
+        Args:
+            lines: Lines to print, may contain Rich markup
+            **kwargs: Passed on to Console.print
+        """
+        if lines:
+            self.console.print("\n".join(lines), **kwargs)
+    
     def validate_connection(self) -> bool:
         """
         Validate database connection before executing command.
@@ -105,7 +125,7 @@ class BaseCommand(ABC):
         """
         try:
             if not self.client.test_connection():
-                self.console.print("[red]❌ Failed to connect to CrateDB cluster[/red]")
+                self.console.print(f"[red]{messages.CONNECTION_FAILED}[/red]")
                 return False
             return True
         except Exception as e:
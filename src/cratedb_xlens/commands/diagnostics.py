@@ -5,12 +5,60 @@ This module contains diagnostic command handlers extracted from the monolithic C
 Handles: test-connection, explain-error, check-balance, zone-analysis commands.
 """
 
-from typing import Optional
+from dataclasses import dataclass
+from typing import List, Optional
 import click
+from rich.markup import escape
 from rich.panel import Panel
 
 from .base import BaseCommand
+from .. import messages
 from ..analyzer import ShardAnalyzer
+from ..database import NodeInfo
+
+
+# Usage thresholds of the verbose test-connection node listing, in percent
+HEAP_CRITICAL_PCT = 90
+HEAP_WARNING_PCT = 75
+DISK_CRITICAL_PCT = 90
+DISK_WARNING_PCT = 85
+
+# Severity points and status indicators by usage level (0 = ok, 1 = warning, 2 = critical)
+_HEAP_SEVERITY = (0, 25, 50)
+_DISK_SEVERITY = (0, 20, 40)
+_STATUS_BY_LEVEL = (
+    # disk ok, disk warning, disk critical
+    ("✅", "📁", "💾"),          # heap ok
+    ("⚠️", "⚠️ 📁", "⚠️ 💾"),    # heap warning
+    ("🔥", "🔥 📁", "🔥 💾"),    # heap critical
+)
+
+
+def _usage_level(used: int, total: int, warning_pct: int, critical_pct: int) -> int:
+    """Classify used/total against percent thresholds without dividing"""
+    if total <= 0:
+        return 0
+    if used * 100 > total * critical_pct:
+        return 2
+    if used * 100 > total * warning_pct:
+        return 1
+    return 0
+
+
+@dataclass
+class NodeRow:
+    """One node line of the verbose test-connection output"""
+    name: str
+    zone: str
+    severity: int
+    corrupted: bool
+    is_master: bool
+    heap_pct: float
+    disk_pct: float
+    heap_used_gb: float
+    heap_max_gb: float
+    disk_free_gb: float
+    status: str  # Status indicator emojis
 
 
 class DiagnosticsCommands(BaseCommand):
@@ -50,161 +98,161 @@ class DiagnosticsCommands(BaseCommand):
                 return
 
             if test_client.test_connection():
-                self.console.print("[green]✅ Successfully connected to CrateDB cluster[/green]")
+                self.console.print(f"[green]{messages.CONNECTED}[/green]")
                 
-                # Get cluster health summary first
+                # Get cluster health summary first. Each section is printed at once,
+                # including the lines gathered before a failure.
+                lines = []
                 try:
                     health = test_client.get_cluster_health_summary()
                     if health:
                         status_color = "green" if health['cluster_health'] == 'GREEN' else ("yellow" if health['cluster_health'] == 'YELLOW' else "red")
-                        self.console.print(f"[blue]🏥 Cluster Health:[/blue] [{status_color}]{health['cluster_health']}[/{status_color}]")
+                        lines.append(f"[blue]🏥 Cluster Health:[/blue] [{status_color}]{escape(str(health['cluster_health']))}[/{status_color}]")
                         
                         # Show entity breakdown if there are issues
                         if health['yellow_entities'] > 0 or health['red_entities'] > 0:
-                            self.console.print(f"  • Issues: {health['red_entities']} RED, {health['yellow_entities']} YELLOW entities")
+                            lines.append(f"  • Issues: {health['red_entities']} RED, {health['yellow_entities']} YELLOW entities")
                         
-                        self.console.print(f"  • Tables: {health['total_tables']}, Partitions: {health['total_partitions']}")
+                        lines.append(f"  • Tables: {health['total_tables']}, Partitions: {health['total_partitions']}")
                 except Exception as e:
-                    self.console.print(f"[yellow]⚠️  Cluster health unavailable: {e}[/yellow]")
+                    lines.append(f"[yellow]{messages.CLUSTER_HEALTH_UNAVAILABLE}: {escape(str(e))}[/yellow]")
+                self.print_lines(lines)
                 
                 # Get basic cluster info
+                lines = []
                 try:
-                    nodes = test_client.get_nodes_info()
-                    self.console.print(f"[blue]📊 Cluster Info:[/blue]")
-                    self.console.print(f"  • Nodes: {len(nodes)}")
-                    
-                    zones = set(node.zone for node in nodes if node.zone and node.zone != 'unknown')
-                    if zones:
-                        self.console.print(f"  • Zones: {len(zones)} ({', '.join(sorted(zones))})")
-                    
+                    # Only the verbose output needs the heap and disk metadata of every node
                     if verbose:
-                        self.console.print(f"\n[blue]📋 Detailed Node Information:[/blue]")
-                        
-                        # Get master node ID
-                        master_node_id = None
-                        try:
-                            master_node_id = test_client.get_master_node_id()
-                        except Exception:
-                            pass  # Master node info not available
-                        
-                        # Add legend
-                        legend_parts = ["🔥 Critical (>90% heap)", "⚠️ Warning (>75% heap)", "💾 Disk Critical (>90%)", "📁 Disk Warning (>85%)", "✅ Healthy"]
-                        if master_node_id:
-                            legend_parts.append("👑 Master node")
-                        self.console.print(f"[dim]    Legend: {' | '.join(legend_parts)}[/dim]")
-                        
-                        def get_severity_score(node):
-                            """Calculate severity score for sorting (higher = more critical)"""
-                            if node.heap_max <= 1 and node.fs_total == 0:
-                                return 100  # Corrupted metadata - highest priority
-                            
-                            heap_pct = (node.heap_used / node.heap_max * 100) if node.heap_max > 0 else 0
-                            disk_pct = (node.fs_used / node.fs_total * 100) if node.fs_total > 0 else 0
-                            
-                            severity = 0
-                            if heap_pct > 90:
-                                severity += 50
-                            elif heap_pct > 75:
-                                severity += 25
-                                
-                            if disk_pct > 90:
-                                severity += 40
-                            elif disk_pct > 85:
-                                severity += 20
-                                
-                            return severity
-                        
-                        # Count nodes by severity for summary
-                        critical_nodes = 0
-                        warning_nodes = 0
-                        healthy_nodes = 0
-                        corrupted_nodes = 0
-                        
-                        for node in nodes:
-                            if node.heap_max <= 1 and node.fs_total == 0:
-                                corrupted_nodes += 1
-                            else:
-                                severity_score = get_severity_score(node)
-                                if severity_score >= 50:
-                                    critical_nodes += 1
-                                elif severity_score >= 25:
-                                    warning_nodes += 1
-                                else:
-                                    healthy_nodes += 1
-                        
-                        # Display severity summary
-                        if critical_nodes > 0 or warning_nodes > 0 or corrupted_nodes > 0:
-                            summary_parts = []
-                            if critical_nodes > 0:
-                                summary_parts.append(f"[red]{critical_nodes} Critical[/red]")
-                            if warning_nodes > 0:
-                                summary_parts.append(f"[yellow]{warning_nodes} Warning[/yellow]")
-                            if corrupted_nodes > 0:
-                                summary_parts.append(f"[red]{corrupted_nodes} Corrupted[/red]")
-                            if healthy_nodes > 0:
-                                summary_parts.append(f"[green]{healthy_nodes} Healthy[/green]")
-                            
-                            self.console.print(f"[dim]    Summary: {' | '.join(summary_parts)}[/dim]")
-                        else:
-                            self.console.print(f"[dim]    Summary: [green]{healthy_nodes} Healthy nodes[/green][/dim]")
-                        
-                        self.console.print("")  # Add blank line before node details
-                        
-                        # Sort by severity (descending), then by name (ascending)
-                        sorted_nodes = sorted(nodes, key=lambda n: (-get_severity_score(n), n.name))
-                        
-                        for node in sorted_nodes:
-                            heap_pct = (node.heap_used / node.heap_max * 100) if node.heap_max > 0 else 0
-                            disk_pct = (node.fs_used / node.fs_total * 100) if node.fs_total > 0 else 0
-                            disk_free_gb = node.fs_available / (1024**3) if node.fs_available > 0 else 0
-                            heap_used_gb = node.heap_used / (1024**3) if node.heap_used > 0 else 0
-                            heap_max_gb = node.heap_max / (1024**3) if node.heap_max > 0 else 0
-                            
-                            # Determine status indicators
-                            status_indicators = []
-                            if heap_pct > 90:
-                                status_indicators.append("🔥")
-                            elif heap_pct > 75:
-                                status_indicators.append("⚠️")
-                            
-                            if disk_pct > 90:
-                                status_indicators.append("💾")
-                            elif disk_pct > 85:
-                                status_indicators.append("📁")
-                            
-                            if not status_indicators:
-                                status_indicators.append("✅")
-                            
-                            status_str = " ".join(status_indicators)
-                            
-                            # Check if this is the master node
-                            is_master = master_node_id and node.id == master_node_id
-                            master_symbol = " 👑" if is_master else ""
-                            
-                            # Handle nodes with missing metadata
-                            if node.heap_max <= 1 and node.fs_total == 0:
-                                self.console.print(f"      • [red]{node.name}[/red] ({node.zone}): [dim]Metadata unavailable[/dim] ⚠️{master_symbol}")
-                            else:
-                                # Determine node name color based on severity
-                                severity_score = get_severity_score(node)
-                                if severity_score >= 50:
-                                    name_color = "red"
-                                elif severity_score >= 25:
-                                    name_color = "yellow"
-                                else:
-                                    name_color = "green"
-                                
-                                self.console.print(f"      • [{name_color}]{node.name}[/{name_color}] ([dim]{node.zone}[/dim]): Heap {heap_pct:.1f}% ([cyan]{heap_used_gb:.1f}GB/{heap_max_gb:.1f}GB[/cyan]), Disk {disk_pct:.1f}% ([cyan]{disk_free_gb:.1f}GB free[/cyan]) {status_str}{master_symbol}")
+                        nodes = test_client.get_nodes_info()
+                        node_count = len(nodes)
+                        zones = sorted(set(node.zone for node in nodes if node.zone and node.zone != 'unknown'))
+                    else:
+                        zone_summary = test_client.get_node_zone_summary()
+                        node_count = zone_summary['node_count']
+                        zones = zone_summary['zones']
+
+                    lines.extend(self._cluster_info_lines(node_count, zones))
+                    if verbose:
+                        lines.extend(self._node_detail_lines(test_client, nodes))
                     
                 except Exception as e:
-                    self.console.print(f"[yellow]⚠️  Basic cluster info unavailable: {e}[/yellow]")
+                    lines.append(f"[yellow]{messages.CLUSTER_INFO_UNAVAILABLE}: {escape(str(e))}[/yellow]")
+                self.print_lines(lines)
             else:
-                self.console.print("[red]❌ Failed to connect to CrateDB cluster[/red]")
-                self.console.print("[yellow]💡 Check your connection configuration[/yellow]")
+                self.console.print(f"[red]{messages.CONNECTION_FAILED}[/red]")
+                self.console.print(f"[yellow]{messages.CONNECTION_HINT}[/yellow]")
                 
         except Exception as e:
             self.handle_error(e, "testing connection")
     
+    def _cluster_info_lines(self, node_count: int, zones: List[str]) -> List[str]:
+        """Build the test-connection node and zone counts"""
+        lines = [f"[blue]📊 Cluster Info:[/blue]", f"  • Nodes: {node_count}"]
+        if zones:
+            lines.append(f"  • Zones: {len(zones)} ({escape(', '.join(zones))})")
+        return lines
+    
+    def _node_detail_lines(self, test_client, nodes: List[NodeInfo]) -> List[str]:
+        """Build the verbose test-connection node listing: legend, severity summary and one line per node"""
+        lines = [f"\n[blue]{messages.NODE_DETAILS_HEADER}[/blue]"]
+
+        # Get master node ID
+        master_node_id = None
+        try:
+            master_node_id = test_client.get_master_node_id()
+        except Exception:
+            pass  # Master node info not available
+
+        # Add legend
+        legend_parts = [f"🔥 Critical (>{HEAP_CRITICAL_PCT}% heap)", f"⚠️ Warning (>{HEAP_WARNING_PCT}% heap)",
+                        f"💾 Disk Critical (>{DISK_CRITICAL_PCT}%)", f"📁 Disk Warning (>{DISK_WARNING_PCT}%)", "✅ Healthy"]
+        if master_node_id:
+            legend_parts.append("👑 Master node")
+        lines.append(f"[dim]    Legend: {' | '.join(legend_parts)}[/dim]")
+
+        rows = self._build_node_rows(nodes, master_node_id)
+
+        # Count nodes by severity for summary
+        critical_nodes = 0
+        warning_nodes = 0
+        healthy_nodes = 0
+        corrupted_nodes = 0
+
+        for row in rows:
+            if row.corrupted:
+                corrupted_nodes += 1
+            elif row.severity >= 50:
+                critical_nodes += 1
+            elif row.severity >= 25:
+                warning_nodes += 1
+            else:
+                healthy_nodes += 1
+
+        # Display severity summary
+        if critical_nodes > 0 or warning_nodes > 0 or corrupted_nodes > 0:
+            summary_parts = []
+            if critical_nodes > 0:
+                summary_parts.append(f"[red]{critical_nodes} Critical[/red]")
+            if warning_nodes > 0:
+                summary_parts.append(f"[yellow]{warning_nodes} Warning[/yellow]")
+            if corrupted_nodes > 0:
+                summary_parts.append(f"[red]{corrupted_nodes} Corrupted[/red]")
+            if healthy_nodes > 0:
+                summary_parts.append(f"[green]{healthy_nodes} Healthy[/green]")
+
+            lines.append(f"[dim]    Summary: {' | '.join(summary_parts)}[/dim]")
+        else:
+            lines.append(f"[dim]    Summary: [green]{healthy_nodes} Healthy nodes[/green][/dim]")
+
+        lines.append("")  # Add blank line before node details
+
+        for row in rows:
+            master_symbol = " 👑" if row.is_master else ""
+
+            # Handle nodes with missing metadata
+            if row.corrupted:
+                lines.append(f"      • [red]{escape(row.name)}[/red] ({escape(row.zone)}): [dim]Metadata unavailable[/dim] ⚠️{master_symbol}")
+            else:
+                # Determine node name color based on severity
+                if row.severity >= 50:
+                    name_color = "red"
+                elif row.severity >= 25:
+                    name_color = "yellow"
+                else:
+                    name_color = "green"
+
+                lines.append(f"      • [{name_color}]{escape(row.name)}[/{name_color}] ([dim]{escape(row.zone)}[/dim]): Heap {row.heap_pct:.1f}% ([cyan]{row.heap_used_gb:.1f}GB/{row.heap_max_gb:.1f}GB[/cyan]), Disk {row.disk_pct:.1f}% ([cyan]{row.disk_free_gb:.1f}GB free[/cyan]) {row.status}{master_symbol}")
+        
+        return lines
+    
+    def _build_node_rows(self, nodes: List[NodeInfo], master_node_id: Optional[str]) -> List[NodeRow]:
+        """Build the rows of the verbose node listing, most severe nodes first"""
+        rows = []
+        
+        for node in nodes:
+            corrupted = node.heap_max <= 1 and node.fs_total == 0
+            heap_level = _usage_level(node.heap_used, node.heap_max, HEAP_WARNING_PCT, HEAP_CRITICAL_PCT)
+            disk_level = _usage_level(node.fs_used, node.fs_total, DISK_WARNING_PCT, DISK_CRITICAL_PCT)
+            
+            rows.append(NodeRow(
+                name=node.name,
+                zone=node.zone,
+                # Corrupted metadata gets the highest priority
+                severity=100 if corrupted else _HEAP_SEVERITY[heap_level] + _DISK_SEVERITY[disk_level],
+                corrupted=corrupted,
+                is_master=bool(master_node_id) and node.id == master_node_id,
+                heap_pct=node.heap_usage_percent,
+                disk_pct=node.disk_usage_percent,
+                heap_used_gb=node.heap_used / (1024**3) if node.heap_used > 0 else 0,
+                heap_max_gb=node.heap_max / (1024**3) if node.heap_max > 0 else 0,
+                disk_free_gb=node.fs_available / (1024**3) if node.fs_available > 0 else 0,
+                status=_STATUS_BY_LEVEL[heap_level][disk_level],
+            ))
+        
+        # Sort by severity (descending), then by name (ascending)
+        rows.sort(key=lambda row: (-row.severity, row.name))
+        return rows
+    
     def explain_error(self, error_message: Optional[str] = None) -> None:
         """Explain CrateDB allocation error messages and provide solutions"""
         self.print_header("CrateDB Error Message Decoder")
@@ -9,14 +9,15 @@ import requests
 import warnings
 import time
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, replace
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeInfo:
     """Information about a CrateDB node"""
     id: str
@@ -41,7 +42,7 @@ class NodeInfo:
         return self.fs_available / (1024**3)
 
 
-@dataclass
+@dataclass(slots=True)
 class ShardInfo:
     """Information about a shard"""
     table_name: str
@@ -215,6 +216,40 @@ class ActiveShardActivity:
         return f"{self.schema_name}.{self.table_name}"
 
 
+# Default values of a node whose sys.nodes metadata is unavailable
+_CORRUPTED_NODE = NodeInfo(id='', name='', zone='unknown', heap_used=0, heap_max=1,
+                           fs_total=0, fs_used=0, fs_available=0)
+
+
+def _make_corrupted(node_id: str, node_name: str) -> NodeInfo:
+    """Build the fallback NodeInfo of a node with corrupted metadata"""
+    return replace(_CORRUPTED_NODE, id=node_id, name=node_name)
+
+
+# Warning printed by CrateDBClient.get_nodes_info for nodes with corrupted metadata
+_WARN_HEADER = "⚠️  Warning: %d node(s) have corrupted/missing metadata:"
+_WARN_NODE = "   • %s: Using default values (heap, filesystem, zone data unavailable)"
+_WARN_FOOTER = "   💡 This may indicate node issues - check CrateDB logs for details"
+
+
+# Statement of CrateDBClient.get_cluster_health_summary, built once at import
+_CLUSTER_HEALTH_QUERY = """
+    SELECT
+        (SELECT health FROM sys.health ORDER BY severity DESC LIMIT 1) AS cluster_health,
+        COUNT(*) FILTER (WHERE health = 'GREEN') AS green_entities,
+        SUM(underreplicated_shards) FILTER (WHERE health = 'GREEN') AS green_underreplicated_shards,
+        COUNT(*) FILTER (WHERE health = 'YELLOW') AS yellow_entities,
+        SUM(underreplicated_shards) FILTER (WHERE health = 'YELLOW') AS yellow_underreplicated_shards,
+        COUNT(*) FILTER (WHERE health = 'RED') AS red_entities,
+        SUM(underreplicated_shards) FILTER (WHERE health = 'RED') AS red_underreplicated_shards,
+        COUNT(*) FILTER (WHERE health NOT IN ('GREEN', 'YELLOW', 'RED')) AS other_entities,
+        SUM(underreplicated_shards) FILTER (WHERE health NOT IN ('GREEN', 'YELLOW', 'RED')) AS other_underreplicated_shards,
+        (SELECT COUNT(*) FROM information_schema.tables WHERE table_schema NOT IN ('sys', 'information_schema', 'pg_catalog')) AS total_tables,
+        (SELECT COUNT(*) FROM information_schema.table_partitions) AS total_partitions
+    FROM sys.health
+    """
+
+
 class CrateDBClient:
     """Client for connecting to CrateDB and executing queries"""
     
@@ -414,76 +449,155 @@ class CrateDBClient:
     
     def get_nodes_info(self) -> List[NodeInfo]:
         """Get information about all nodes in the cluster with robust error handling"""
-        nodes = []
-        nodes_with_missing_metadata = []
+        # Fast path: fetch all nodes in a single round-trip. Without retries, as a
+        # node with corrupted metadata fails the whole query with a server error.
+        try:
+            batch_query = """
+            SELECT 
+                id,
+                name,
+                COALESCE(attributes['zone'], 'unknown') as zone,
+                COALESCE(heap['used'], 0) as heap_used,
+                COALESCE(heap['max'], 1) as heap_max,
+                COALESCE(fs['total']['size'], 0) as fs_total,
+                COALESCE(fs['total']['used'], 0) as fs_used,
+                COALESCE(fs['total']['available'], 0) as fs_available
+            FROM sys.nodes 
+            WHERE name IS NOT NULL
+            ORDER BY name
+            """
+            batch_result = self.execute_query(batch_query, retry=False)
+        except Exception:
+            nodes, nodes_with_missing_metadata = self._get_nodes_info_per_node()
+        else:
+            rows = batch_result.get('rows', [])
+            if not rows:
+                return []
+            
+            nodes = []
+            nodes_with_missing_metadata = []
+            for row in rows:
+                node = self._node_info_from_row(row)
+                if node.heap_max <= 1 and node.fs_total == 0:
+                    nodes_with_missing_metadata.append(node.name)
+                nodes.append(node)
+        
+        # Print nodes with missing metadata if any, with a single call
+        if nodes_with_missing_metadata:
+            print("\n".join([
+                _WARN_HEADER % len(nodes_with_missing_metadata),
+                *(_WARN_NODE % node_name for node_name in nodes_with_missing_metadata),
+                _WARN_FOOTER,
+            ]))
         
+        return nodes
+    
+    def _get_nodes_info_per_node(self) -> Tuple[List[NodeInfo], List[str]]:
+        """Query the nodes one by one, so corrupted metadata only affects its own node
+        
+        The per-node queries run concurrently on a thread pool for the call. Returns the
+        nodes in name order and the names of nodes whose metadata was unavailable.
+        """
         # First, get list of all node names
         try:
             name_query = "SELECT id, name FROM sys.nodes WHERE name IS NOT NULL ORDER BY name"
             name_result = self.execute_query(name_query)
         except Exception:
-            return nodes
+            return [], []
+        
+        rows = name_result.get('rows', [])
+        if not rows:
+            return [], []
         
         # Process each node individually to handle corrupted metadata gracefully
-        for row in name_result.get('rows', []):
-            node_id, node_name = row
-            
-            try:
-                # Try to get full node information
-                detailed_query = """
-                SELECT 
-                    id,
-                    name,
-                    COALESCE(attributes['zone'], 'unknown') as zone,
-                    COALESCE(heap['used'], 0) as heap_used,
-                    COALESCE(heap['max'], 1) as heap_max,
-                    COALESCE(fs['total']['size'], 0) as fs_total,
-                    COALESCE(fs['total']['used'], 0) as fs_used,
-                    COALESCE(fs['total']['available'], 0) as fs_available
-                FROM sys.nodes 
-                WHERE name = ?
-                """
-                
-                detailed_result = self.execute_query(detailed_query, [node_name])
-                
-                if detailed_result.get('rows'):
-                    detail_row = detailed_result['rows'][0]
-                    nodes.append(NodeInfo(
-                        id=detail_row[0],
-                        name=detail_row[1],
-                        zone=detail_row[2] or 'unknown',
-                        heap_used=detail_row[3] or 0,
-                        heap_max=detail_row[4] or 0,
-                        fs_total=detail_row[5] or 0,
-                        fs_used=detail_row[6] or 0,
-                        fs_available=detail_row[7] or 0
-                    ))
-                else:
-                    raise Exception("No detailed data available")
-                    
-            except Exception:
-                # Fallback: create node with default values for corrupted metadata
-                nodes_with_missing_metadata.append(node_name)
-                nodes.append(NodeInfo(
-                    id=node_id,
-                    name=node_name,
-                    zone='unknown',
-                    heap_used=0,
-                    heap_max=1,
-                    fs_total=0,
-                    fs_used=0,
-                    fs_available=0
-                ))
+        nodes = []
+        nodes_with_missing_metadata = []
+        with ThreadPoolExecutor(max_workers=min(16, len(rows)), thread_name_prefix='xlens-nodes') as executor:
+            for node, missing_metadata in executor.map(
+                    lambda row: self._fetch_node_detail(*row), rows):
+                if missing_metadata:
+                    nodes_with_missing_metadata.append(node.name)
+                nodes.append(node)
         
-        # Log nodes with missing metadata if any
-        if nodes_with_missing_metadata:
-            print(f"⚠️  Warning: {len(nodes_with_missing_metadata)} node(s) have corrupted/missing metadata:")
-            for node_name in nodes_with_missing_metadata:
-                print(f"   • {node_name}: Using default values (heap, filesystem, zone data unavailable)")
-            print("   💡 This may indicate node issues - check CrateDB logs for details")
+        return nodes, nodes_with_missing_metadata
+    
+    def _fetch_node_detail(self, node_id: str, node_name: str) -> Tuple[NodeInfo, bool]:
+        """Get full information about a single node
         
-        return nodes
+        Returns the node and whether its metadata was unavailable, in which case
+        the node carries default values.
+        """
+        try:
+            # Try to get full node information
+            detailed_query = """
+            SELECT 
+                id,
+                name,
+                COALESCE(attributes['zone'], 'unknown') as zone,
+                COALESCE(heap['used'], 0) as heap_used,
+                COALESCE(heap['max'], 1) as heap_max,
+                COALESCE(fs['total']['size'], 0) as fs_total,
+                COALESCE(fs['total']['used'], 0) as fs_used,
+                COALESCE(fs['total']['available'], 0) as fs_available
+            FROM sys.nodes 
+            WHERE name = ?
+            """
+            
+            detailed_result = self.execute_query(detailed_query, [node_name])
+            
+            if detailed_result.get('rows'):
+                node = self._node_info_from_row(detailed_result['rows'][0])
+                return node, node.heap_max <= 1 and node.fs_total == 0
+            else:
+                raise Exception("No detailed data available")
+                
+        except Exception:
+            # Fallback: create node with default values for corrupted metadata
+            return _make_corrupted(node_id, node_name), True
     
+    @staticmethod
+    def _node_info_from_row(row: List[Any]) -> NodeInfo:
+        """Build a NodeInfo from a row of the COALESCE'd sys.nodes detail queries
+        
+        NULL values fall back to the same defaults as the COALESCE expressions.
+        """
+        return NodeInfo(
+            id=row[0],
+            name=row[1],
+            zone=row[2] or 'unknown',
+            heap_used=row[3] or 0,
+            heap_max=row[4] or 1,
+            fs_total=row[5] or 0,
+            fs_used=row[6] or 0,
+            fs_available=row[7] or 0
+        )
+
+    def get_node_zone_summary(self) -> Dict[str, Any]:
+        """Count the nodes and list their zones, without fetching heap and disk metadata
+
+        Falls back to get_nodes_info when the query fails, as a node with corrupted
+        metadata fails the whole sys.nodes query.
+        """
+        zone_counts: Dict[str, int] = {}
+        try:
+            query = """
+            SELECT COALESCE(attributes['zone'], 'unknown') AS zone, COUNT(*) AS node_count
+            FROM sys.nodes
+            WHERE name IS NOT NULL
+            GROUP BY 1
+            """
+            result = self.execute_query(query, retry=False)
+            for zone, node_count in result.get('rows', []):
+                zone_counts[zone] = node_count
+        except Exception:
+            for node in self.get_nodes_info():
+                zone_counts[node.zone] = zone_counts.get(node.zone, 0) + 1
+
+        return {
+            'node_count': sum(zone_counts.values()),
+            'zones': sorted(zone for zone in zone_counts if zone and zone != 'unknown'),
+        }
+
     def get_shards_info(self, table_name: Optional[str] = None, 
                        min_size_gb: Optional[float] = None,
                        max_size_gb: Optional[float] = None,
@@ -644,23 +758,7 @@ class CrateDBClient:
     def get_cluster_health_summary(self) -> Optional[dict]:
         """Get comprehensive cluster health summary with underreplicated shards"""
         try:
-            query = """
-            SELECT
-                (SELECT health FROM sys.health ORDER BY severity DESC LIMIT 1) AS cluster_health,
-                COUNT(*) FILTER (WHERE health = 'GREEN') AS green_entities,
-                SUM(underreplicated_shards) FILTER (WHERE health = 'GREEN') AS green_underreplicated_shards,
-                COUNT(*) FILTER (WHERE health = 'YELLOW') AS yellow_entities,
-                SUM(underreplicated_shards) FILTER (WHERE health = 'YELLOW') AS yellow_underreplicated_shards,
-                COUNT(*) FILTER (WHERE health = 'RED') AS red_entities,
-                SUM(underreplicated_shards) FILTER (WHERE health = 'RED') AS red_underreplicated_shards,
-                COUNT(*) FILTER (WHERE health NOT IN ('GREEN', 'YELLOW', 'RED')) AS other_entities,
-                SUM(underreplicated_shards) FILTER (WHERE health NOT IN ('GREEN', 'YELLOW', 'RED')) AS other_underreplicated_shards,
-                (SELECT COUNT(*) FROM information_schema.tables WHERE table_schema NOT IN ('sys', 'information_schema', 'pg_catalog')) AS total_tables,
-                (SELECT COUNT(*) FROM information_schema.table_partitions) AS total_partitions
-            FROM sys.health
-            """
-            
-            result = self.execute_query(query)
+            result = self.execute_query(_CLUSTER_HEALTH_QUERY)
             if result.get('rows'):
                 row = result['rows'][0]
                 return {
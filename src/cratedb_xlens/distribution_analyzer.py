@@ -378,9 +378,10 @@ class DistributionAnalyzer:
         # Zone analysis if available
         try:
             zone_distribution = {}
+            nodes_by_name = {n.name: n for n in all_nodes_info}
             for node_name, node_data in table_dist.node_distributions.items():
                 # Try to get zone info for each node
-                node_info = next((n for n in all_nodes_info if n.name == node_name), None)
+                node_info = nodes_by_name.get(node_name)
                 if node_info and hasattr(node_info, 'attributes') and node_info.attributes and 'zone' in node_info.attributes:
                     zone = node_info.attributes['zone']
                     if zone not in zone_distribution:
@@ -0,0 +1,16 @@
+"""
+User-facing messages of the XMover connection checks
+
+The messages are plain text, callers add the Rich markup when printing them.
+Tests assert on the same constants.
+"""
+
+# Connection test
+CONNECTED = "✅ Successfully connected to CrateDB cluster"
+CONNECTION_FAILED = "❌ Failed to connect to CrateDB cluster"
+CONNECTION_HINT = "💡 Check your connection configuration"
+
+# Cluster overview of test-connection
+CLUSTER_HEALTH_UNAVAILABLE = "⚠️  Cluster health unavailable"
+CLUSTER_INFO_UNAVAILABLE = "⚠️  Basic cluster info unavailable"
+NODE_DETAILS_HEADER = "📋 Detailed Node Information:"
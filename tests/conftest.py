@@ -8,9 +8,30 @@ Install dev dependencies with: uv sync
 
 import pytest
 import os
+from io import StringIO
 from unittest.mock import Mock, patch
 from cratedb_xlens.database import CrateDBClient
 
+from helpers import FakeConsole
+
+
+def pytest_addoption(parser):
+    """Register custom command line options"""
+    parser.addoption(
+        '--run-slow', action='store_true', default=False,
+        help='run tests marked as slow'
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests marked as slow unless --run-slow is given"""
+    if config.getoption('--run-slow'):
+        return
+    skip_slow = pytest.mark.skip(reason='slow test, use --run-slow to run')
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip_slow)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_environment():
@@ -128,6 +149,26 @@ def mock_env_file():
         yield
 
 
+@pytest.fixture(scope="session")
+def shared_sio():
+    """StringIO buffer shared by all tests rendering through a real Rich console"""
+    return StringIO()
+
+
+@pytest.fixture
+def clean_sio(shared_sio):
+    """Hand out the shared StringIO buffer emptied for the current test"""
+    shared_sio.seek(0)
+    shared_sio.truncate(0)
+    return shared_sio
+
+
+@pytest.fixture
+def fake_console():
+    """Console stub recording plain text output"""
+    return FakeConsole()
+
+
 @pytest.fixture
 def cli_runner():
     """Click CLI test runner"""
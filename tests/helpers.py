@@ -0,0 +1,114 @@
+"""
+Helpers shared by the XMover tests
+
+Plain functions and stubs imported by the test modules. Fixtures and pytest
+hooks live in conftest.py.
+"""
+
+from collections import Counter
+from contextlib import nullcontext
+
+from rich.text import Text
+
+
+# Error raised by CrateDB when a sys.nodes metadata object of a node is NULL
+NULL_METADATA_ERROR = 'NullPointerException[Cannot invoke "java.util.Map.get(Object)" because "map" is null]'
+
+
+def make_execute_query_responder(node_names_rows, per_node_rows_by_name, failing_names=(),
+                                 batch_error=None):
+    """Build an ``execute_query`` side effect answering the queries of ``get_nodes_info``
+
+    Queries are classified by their SQL and parameters instead of by call order,
+    so the answers do not depend on how the nodes are iterated or scheduled.
+    ``node_names_rows`` are the ``[id, name]`` rows of the node names query and
+    ``per_node_rows_by_name`` maps a node name to its detail row. The detail
+    query of a node in ``failing_names`` raises, and so does the batched query
+    over all nodes, as it does on a cluster with corrupted node metadata.
+    ``batch_error`` makes the batched query fail on its own. The per-zone node
+    count query is answered like the batched query.
+    """
+    failing = frozenset(failing_names)
+    if batch_error is None and failing:
+        batch_error = Exception(NULL_METADATA_ERROR)
+
+    def respond(query, parameters=None, **kwargs):
+        if parameters:
+            name = parameters[0]
+            if name in failing:
+                raise Exception(NULL_METADATA_ERROR)
+            return {'rows': [per_node_rows_by_name[name]]}
+        if 'COALESCE' in query:
+            if batch_error is not None:
+                raise batch_error
+            rows = [per_node_rows_by_name[name] for _, name in node_names_rows]
+            if 'GROUP BY' in query:
+                zones = Counter(row[2] for row in rows)
+                return {'rows': [list(item) for item in zones.items()]}
+            return {'rows': rows}
+        return {'rows': node_names_rows}
+
+    return respond
+
+
+def assert_contains_all(output, needles):
+    """Assert that every needle occurs in output"""
+    missing = [needle for needle in needles if needle not in output]
+    assert not missing, f"missing from output: {missing}"
+
+
+def node_zone_summary(nodes):
+    """Summarize ``nodes`` like ``CrateDBClient.get_node_zone_summary`` does"""
+    return {
+        'node_count': len(nodes),
+        'zones': sorted({node.zone for node in nodes if node.zone and node.zone != 'unknown'}),
+    }
+
+
+class FakeConsole:
+    """Lightweight stand-in for rich.console.Console in assertion-only tests
+
+    Records each printed line as plain text with Rich markup stripped, without
+    any layout, wrapping or ANSI rendering.
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def print(self, *objects, sep=' ', **kwargs):
+        self.lines.extend(sep.join(self._plain(obj) for obj in objects).split('\n'))
+
+    log = print
+
+    def print_json(self, json=None, **kwargs):
+        self.lines.append(json or '')
+
+    def rule(self, title='', **kwargs):
+        self.lines.append(self._plain(title))
+
+    def status(self, *args, **kwargs):
+        return nullcontext()
+
+    def getvalue(self):
+        """Return everything printed so far as a single string"""
+        return "\n".join(self.lines)
+
+    def reset(self):
+        """Discard everything printed so far"""
+        self.lines.clear()
+
+    def first_line_containing(self, needle):
+        """Return the index of the first printed line containing needle, or -1"""
+        return next((i for i, line in enumerate(self.lines) if needle in line), -1)
+
+    @staticmethod
+    def _plain(obj):
+        if isinstance(obj, str):
+            return Text.from_markup(obj).plain
+        if isinstance(obj, Text):
+            return obj.plain
+        # Panels and paddings wrap the content we are interested in
+        renderable = getattr(obj, 'renderable', None)
+        if renderable is not None:
+            return FakeConsole._plain(renderable)
+        return str(obj)
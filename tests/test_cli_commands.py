@@ -184,6 +184,7 @@ class TestTestConnectionCommand:
                 Mock(name='data-hot-1', zone='zone1'),
                 Mock(name='data-hot-2', zone='zone2')
             ]
+            mock_client.get_node_zone_summary.return_value = {'node_count': 2, 'zones': ['zone1', 'zone2']}
             mock_client_class.return_value = mock_client
             
             result = runner.invoke(main, ['test-connection'])
@@ -217,6 +218,7 @@ class TestTestConnectionCommand:
             mock_client.get_nodes_info.return_value = [
                 Mock(name='data-hot-1', zone='zone1')
             ]
+            mock_client.get_node_zone_summary.return_value = {'node_count': 1, 'zones': ['zone1']}
             mock_client_class.return_value = mock_client
             
             result = runner.invoke(main, ['test-connection', '--connection-string', 'custom://connection'])
@@ -24,6 +24,7 @@ def mock_client():
         Mock(name='data-hot-1', zone='zone1'),
         Mock(name='data-hot-2', zone='zone2')
     ]
+    client.get_node_zone_summary.return_value = {'node_count': 2, 'zones': ['zone1', 'zone2']}
     # Mock for zone-analysis command
     client.get_shards_info.return_value = []
     return client
@@ -10,360 +10,290 @@ to handle the 500 error scenarios, including:
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from io import StringIO
+from dataclasses import replace
+from types import MappingProxyType
+from unittest.mock import MagicMock, create_autospec
 
 from cratedb_xlens.database import CrateDBClient, NodeInfo
+from cratedb_xlens import messages
 from cratedb_xlens.commands.diagnostics import DiagnosticsCommands
 from rich.console import Console
 
+from helpers import FakeConsole, node_zone_summary
+
+
+GREEN_HEALTH = MappingProxyType({
+    'cluster_health': 'GREEN',
+    'green_entities': 100,
+    'yellow_entities': 0,
+    'red_entities': 0,
+    'total_tables': 1,
+    'total_partitions': 1
+})
+
+# Critical node (>90% heap and disk)
+CRITICAL_NODE = NodeInfo(id='critical', name='critical-node', zone='us-west-2a',
+                         heap_used=3_800_000_000, heap_max=4_000_000_000,  # 95% heap
+                         fs_total=100_000_000_000, fs_used=95_000_000_000, fs_available=5_000_000_000)  # 95% disk
+
+# Warning node (>75% heap, >85% disk)
+WARNING_NODE = NodeInfo(id='warning', name='warning-node', zone='us-west-2b',
+                        heap_used=3_200_000_000, heap_max=4_000_000_000,  # 80% heap
+                        fs_total=100_000_000_000, fs_used=87_000_000_000, fs_available=13_000_000_000)  # 87% disk
+
+# Healthy node
+HEALTHY_NODE = NodeInfo(id='healthy', name='healthy-node', zone='us-west-2c',
+                        heap_used=1_000_000_000, heap_max=4_000_000_000,  # 25% heap
+                        fs_total=100_000_000_000, fs_used=30_000_000_000, fs_available=70_000_000_000)  # 30% disk
+
+# Node at half of its heap and disk capacity
+HALF_USED_NODE = NodeInfo(id='1', name='node1', zone='us-west-2a',
+                          heap_used=1_000_000_000, heap_max=2_000_000_000,  # 50% heap
+                          fs_total=100_000_000_000, fs_used=50_000_000_000, fs_available=45_000_000_000)  # 50% disk
+
+# Node with fallback values for unavailable metadata
+CORRUPTED_NODE = NodeInfo(id='corrupted', name='corrupted-node', zone='unknown',
+                          heap_used=0, heap_max=1, fs_total=0, fs_used=0, fs_available=0)
+
+# Nodes with different severity levels whose names sort opposite to their severity
+SORTING_NODES = (
+    # Healthy node (should appear last)
+    replace(HEALTHY_NODE, name='aaaa-healthy', zone='us-west-2a'),
+    # Critical node (should appear first due to severity)
+    replace(CRITICAL_NODE, name='zzzz-critical', zone='us-west-2b'),
+    # Warning node with 50% disk (should appear in middle)
+    replace(WARNING_NODE, name='mmmm-warning', zone='us-west-2c',
+            fs_used=50_000_000_000, fs_available=50_000_000_000),
+    # Corrupted node (should appear first with highest priority)
+    replace(CORRUPTED_NODE, name='bbbb-corrupted'),
+)
+
+
+# Node sets rendered in verbose mode, keyed by scenario name
+VERBOSE_SCENARIOS = MappingProxyType({
+    'resource-percentages': (HEALTHY_NODE, WARNING_NODE),
+    'corrupted-metadata': (replace(HALF_USED_NODE, name='healthy-node'), CORRUPTED_NODE),
+    'status-indicators': (CRITICAL_NODE, WARNING_NODE, HEALTHY_NODE),
+    'severity-sorting': SORTING_NODES,
+    'color-coding': (
+        # Critical severity node with 50% disk (should be red)
+        replace(CRITICAL_NODE, fs_used=50_000_000_000, fs_available=50_000_000_000),
+        # Warning severity node with 50% disk (should be yellow)
+        replace(WARNING_NODE, fs_used=50_000_000_000, fs_available=50_000_000_000),
+        # Healthy node (should be green)
+        HEALTHY_NODE,
+    ),
+})
+
+
+def configure(mock_client, *, ok=True, health=GREEN_HEALTH, nodes=(),
+              health_error=None, nodes_error=None):
+    """Configure a client mock for one test-connection scenario in a single call"""
+    mock_client.configure_mock(**{
+        'test_connection.return_value': ok,
+        'get_cluster_health_summary.return_value': health,
+        'get_cluster_health_summary.side_effect': health_error,
+        'get_nodes_info.return_value': list(nodes),
+        'get_nodes_info.side_effect': nodes_error,
+        'get_node_zone_summary.return_value': node_zone_summary(nodes),
+        'get_node_zone_summary.side_effect': nodes_error,
+    })
+
+
+@pytest.fixture(scope="module")
+def shared_client():
+    """Autospecced CrateDBClient mock shared by the tests of this module
+
+    Autospeccing introspects the whole client class, so it is done once per module.
+    """
+    return create_autospec(CrateDBClient, spec_set=True, instance=True)
+
+
+@pytest.fixture
+def cmd_factory(shared_client):
+    """Provide a factory for DiagnosticsCommands using the shared client mock
+
+    The console is a FakeConsole, as these tests only assert on plain text.
+    The client mock is reset after every test, so no state leaks between
+    tests and they can be distributed across pytest-xdist workers.
+    """
+    console = FakeConsole()
+
+    def make(**scenario):
+        configure(shared_client, **scenario)
+
+        cmd = DiagnosticsCommands(shared_client, console=console)
+        return cmd, console, shared_client
+
+    yield make
+    shared_client.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(scope="module")
+def verbose_outputs(shared_client):
+    """Render every verbose scenario once and keep the recording consoles by name
+
+    Assertion-only tests read from these recordings instead of rendering the
+    same node set again.
+    """
+    outputs = {}
+    for name, nodes in VERBOSE_SCENARIOS.items():
+        configure(shared_client, nodes=nodes)
+        cmd = DiagnosticsCommands(shared_client, console=FakeConsole())
+        cmd.test_connection(verbose=True)
+        outputs[name] = cmd.console
+        shared_client.reset_mock(return_value=True, side_effect=True)
+    return outputs
 
 class TestEnhancedTestConnectionMethods:
     """Test the enhanced test-connection method functionality directly"""
 
-    def test_test_connection_basic_functionality(self):
+    def test_test_connection_basic_functionality(self, cmd_factory, clean_sio, mocker):
         """Test basic test-connection method without verbose flag"""
-        
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = True
-        mock_client.get_cluster_health_summary.return_value = {
-            'cluster_health': 'GREEN',
-            'total_tables': 50,
-            'total_partitions': 10
-        }
-        mock_client.get_nodes_info.return_value = [
-            NodeInfo(id='1', name='node1', zone='us-west-2a', heap_used=1000000000, heap_max=2000000000,
-                    fs_total=100000000000, fs_used=50000000000, fs_available=45000000000)
-        ]
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
-        
+
+        cmd, console, mock_client = cmd_factory(nodes=[HALF_USED_NODE])
+        node_detail_lines = mocker.spy(cmd, '_node_detail_lines')
+
+        # Render through a real Rich console once to cover markup and layout.
+        # Markup stays enabled as the assertions expect the rendered plain text.
+        cmd.console = Console(file=clean_sio, width=120, force_terminal=False, no_color=True,
+                              highlight=False, emoji=False, soft_wrap=True)
+
         cmd.test_connection(verbose=False)
-        output = console.file.getvalue()
+        output = clean_sio.getvalue()
         
-        assert "✅ Successfully connected to CrateDB cluster" in output
+        assert messages.CONNECTED in output
         assert "🏥 Cluster Health: GREEN" in output
         assert "📊 Cluster Info:" in output
         assert "Nodes: 1" in output
         
-        # Should NOT show detailed node information without verbose
-        assert "📋 Detailed Node Information:" not in output
+        # Should NOT show, nor build, detailed node information without verbose
+        assert messages.NODE_DETAILS_HEADER not in output
+        node_detail_lines.assert_not_called()
+        mock_client.get_nodes_info.assert_not_called()
 
-    def test_test_connection_with_verbose_flag(self):
-        """Test test-connection method with verbose=True shows detailed info"""
-        
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = True
-        mock_client.get_cluster_health_summary.return_value = {
-            'cluster_health': 'GREEN',
-            'total_tables': 100,
-            'total_partitions': 25
-        }
-        
-        # Mock nodes with different resource states
-        mock_client.get_nodes_info.return_value = [
-            NodeInfo(id='1', name='healthy-node', zone='us-west-2a', 
-                    heap_used=1000000000, heap_max=4000000000,  # 25% heap
-                    fs_total=100000000000, fs_used=30000000000, fs_available=70000000000),  # 30% disk
-            NodeInfo(id='2', name='warning-node', zone='us-west-2b',
-                    heap_used=3200000000, heap_max=4000000000,  # 80% heap  
-                    fs_total=100000000000, fs_used=87000000000, fs_available=13000000000)  # 87% disk
-        ]
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
-        
-        cmd.test_connection(verbose=True)
-        output = console.file.getvalue()
-        
-        assert "✅ Successfully connected to CrateDB cluster" in output
-        
-        # Should show detailed node information with verbose
-        assert "📋 Detailed Node Information:" in output
-        assert "healthy-node" in output
-        assert "warning-node" in output
-        
-        # Should show resource percentages
-        assert "25.0%" in output  # Healthy heap
-        assert "30.0%" in output  # Healthy disk
-        assert "80.0%" in output  # Warning heap
-        assert "87.0%" in output  # Warning disk
-        
-        # Should show resource amounts in GB
-        assert "GB" in output
-
-    def test_test_connection_with_custom_connection_string(self):
+    def test_test_connection_with_custom_connection_string(self, cmd_factory, mocker):
         """Test test-connection with custom connection string"""
         
-        mock_client = Mock(spec=CrateDBClient)
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
-        
-        with patch('cratedb_xlens.database.CrateDBClient') as mock_client_class:
-            mock_new_client = Mock(spec=CrateDBClient)
-            mock_client_class.return_value = mock_new_client
-            
-            mock_new_client.test_connection.return_value = True
-            mock_new_client.get_cluster_health_summary.return_value = {'cluster_health': 'GREEN', 'total_tables': 1, 'total_partitions': 1}
-            mock_new_client.get_nodes_info.return_value = []
-            
-            custom_connection = "crate://custom-host:4200"
-            cmd.test_connection(connection_string=custom_connection, verbose=False)
-            
-            # Verify custom connection string was used
-            mock_client_class.assert_called_with(custom_connection)
-
-    def test_test_connection_verbose_with_corrupted_metadata(self):
-        """Test verbose output properly handles nodes with corrupted metadata"""
+        cmd, console, mock_client = cmd_factory()
         
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = True
-        mock_client.get_cluster_health_summary.return_value = {'cluster_health': 'GREEN', 'total_tables': 1, 'total_partitions': 1}
+        mock_client_class = mocker.patch('cratedb_xlens.database.CrateDBClient')
+        mock_new_client = create_autospec(CrateDBClient, spec_set=True, instance=True)
+        mock_client_class.return_value = mock_new_client
+        configure(mock_new_client)
         
-        # Mix of healthy and corrupted nodes
-        mock_client.get_nodes_info.return_value = [
-            NodeInfo(id='1', name='healthy-node', zone='us-west-2a', 
-                    heap_used=1000000000, heap_max=2000000000,
-                    fs_total=100000000000, fs_used=50000000000, fs_available=45000000000),
-            NodeInfo(id='2', name='corrupted-node', zone='unknown',
-                    heap_used=0, heap_max=1,  # Fallback values
-                    fs_total=0, fs_used=0, fs_available=0)
-        ]
+        custom_connection = "crate://custom-host:4200"
+        cmd.test_connection(connection_string=custom_connection, verbose=False)
         
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
-        
-        cmd.test_connection(verbose=True)
-        output = console.file.getvalue()
-        
-        # Should show both nodes
-        assert "healthy-node" in output
-        assert "corrupted-node" in output
-        
-        # Should show metadata unavailable message for corrupted node
-        assert "Metadata unavailable" in output
-        assert "⚠️" in output
+        # Verify custom connection string was used
+        mock_client_class.assert_called_with(custom_connection)
+        mock_new_client.test_connection.assert_called_once_with()
+        mock_client.test_connection.assert_not_called()
 
-    def test_test_connection_verbose_status_indicators(self):
-        """Test that verbose mode shows appropriate status indicators"""
-        
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = True
-        mock_client.get_cluster_health_summary.return_value = {'cluster_health': 'GREEN', 'total_tables': 1, 'total_partitions': 1}
-        
-        # Nodes with different resource usage levels
-        mock_client.get_nodes_info.return_value = [
-            # Critical node (>90% heap and disk)
-            NodeInfo(id='critical', name='critical-node', zone='us-west-2a',
-                    heap_used=3800000000, heap_max=4000000000,  # 95% heap
-                    fs_total=100000000000, fs_used=95000000000, fs_available=5000000000),  # 95% disk
-            
-            # Warning node (>75% heap, >85% disk)
-            NodeInfo(id='warning', name='warning-node', zone='us-west-2b',
-                    heap_used=3200000000, heap_max=4000000000,  # 80% heap
-                    fs_total=100000000000, fs_used=87000000000, fs_available=13000000000),  # 87% disk
-            
-            # Healthy node
-            NodeInfo(id='healthy', name='healthy-node', zone='us-west-2c',
-                    heap_used=1000000000, heap_max=4000000000,  # 25% heap
-                    fs_total=100000000000, fs_used=30000000000, fs_available=70000000000)  # 30% disk
-        ]
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
-        
-        cmd.test_connection(verbose=True)
-        output = console.file.getvalue()
-        
-        # Should show status indicators
-        assert "🔥" in output  # Critical indicator
-        assert "💾" in output  # Critical disk indicator
-        assert "⚠️" in output  # Warning indicator
-        assert "📁" in output  # Disk warning indicator
-        assert "✅" in output  # Healthy indicator
-
-    def test_test_connection_connection_failure(self):
+    def test_test_connection_connection_failure(self, cmd_factory):
         """Test test-connection handles connection failures gracefully"""
         
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = False
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
+        cmd, console, mock_client = cmd_factory(ok=False)
         
         cmd.test_connection(verbose=False)
-        output = console.file.getvalue()
+        output = console.getvalue()
         
-        assert "❌ Failed to connect to CrateDB cluster" in output
-        assert "💡 Check your connection configuration" in output
+        assert messages.CONNECTION_FAILED in output
+        assert messages.CONNECTION_HINT in output
 
-    def test_test_connection_health_query_failure(self):
+    def test_test_connection_health_query_failure(self, cmd_factory):
         """Test handling when health query fails but connection succeeds"""
         
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = True
-        mock_client.get_cluster_health_summary.side_effect = Exception("Health query failed")
-        mock_client.get_nodes_info.return_value = []
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
+        cmd, console, mock_client = cmd_factory(health_error=Exception("Health query failed"))
         
         cmd.test_connection(verbose=False)
-        output = console.file.getvalue()
+        output = console.getvalue()
         
-        assert "✅ Successfully connected to CrateDB cluster" in output
-        assert "⚠️  Cluster health unavailable" in output
+        assert messages.CONNECTED in output
+        assert messages.CLUSTER_HEALTH_UNAVAILABLE in output
 
-    def test_test_connection_nodes_query_failure(self):
+    def test_test_connection_nodes_query_failure(self, cmd_factory):
         """Test handling when nodes query fails but connection succeeds"""
         
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = True
-        mock_client.get_cluster_health_summary.return_value = {'cluster_health': 'GREEN', 'total_tables': 1, 'total_partitions': 1}
-        mock_client.get_nodes_info.side_effect = Exception("Nodes query failed")
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
+        cmd, console, mock_client = cmd_factory(nodes_error=Exception("Nodes query failed"))
         
         cmd.test_connection(verbose=False)
-        output = console.file.getvalue()
+        output = console.getvalue()
         
-        assert "✅ Successfully connected to CrateDB cluster" in output
-        assert "⚠️  Basic cluster info unavailable" in output
+        assert messages.CONNECTED in output
+        assert messages.CLUSTER_INFO_UNAVAILABLE in output
+
+    def test_test_connection_escapes_error_markup(self, cmd_factory):
+        """Test that brackets in an error message are printed literally, not parsed as markup"""
+
+        cmd, console, mock_client = cmd_factory(nodes_error=Exception("SQLParseException[line 1:8: mismatched [/input]]"))
+
+        cmd.test_connection(verbose=False)
+        output = console.getvalue()
+
+        assert f"{messages.CLUSTER_INFO_UNAVAILABLE}: SQLParseException[line 1:8: mismatched [/input]]" in output
+
+    @pytest.mark.parametrize('scenario, expected_substrings, forbidden_substrings', [
+        pytest.param(
+            'resource-percentages',
+            (messages.CONNECTED, messages.NODE_DETAILS_HEADER,
+             "healthy-node", "warning-node",
+             "25.0%", "30.0%",  # Healthy heap and disk
+             "80.0%", "87.0%",  # Warning heap and disk
+             "GB"),
+            ("Metadata unavailable", "1 Critical"),
+            id='resource-percentages'),
+        pytest.param(
+            'corrupted-metadata',
+            ("healthy-node", "corrupted-node", "Metadata unavailable", "⚠️"),
+            (),
+            id='corrupted-metadata'),
+        pytest.param(
+            'status-indicators',
+            ("🔥",  # Critical indicator
+             "💾",  # Critical disk indicator
+             "⚠️",  # Warning indicator
+             "📁",  # Disk warning indicator
+             "✅"),  # Healthy indicator
+            ("Metadata unavailable",),
+            id='status-indicators'),
+        pytest.param(
+            'severity-sorting',
+            ("Legend:", "🔥 Critical (>90% heap)", "⚠️ Warning (>75% heap)",
+             "💾 Disk Critical (>90%)", "📁 Disk Warning (>85%)", "Healthy",
+             "Summary:", "1 Critical", "1 Warning", "1 Healthy", "1 Corrupted",
+             "🔥", "💾", "⚠️", "✅"),
+            (),
+            id='severity-legend'),
+        pytest.param(
+            'color-coding',
+            # We can't easily test the actual colors in console output, but we can verify the nodes appear
+            ("critical-node", "warning-node", "healthy-node"),
+            ("Metadata unavailable",),
+            id='color-coding'),
+    ])
+    def test_test_connection_verbose_render(self, verbose_outputs, scenario, expected_substrings,
+                                            forbidden_substrings):
+        """Test verbose mode renders node details, indicators, legend and summary"""
+
+        output = verbose_outputs[scenario].getvalue()
+
+        for expected in expected_substrings:
+            assert expected in output
+        for forbidden in forbidden_substrings:
+            assert forbidden not in output
+
+    def test_test_connection_verbose_severity_sorting(self, verbose_outputs):
+        """Test that verbose mode sorts nodes by severity"""
+
+        console = verbose_outputs['severity-sorting']
 
-    def test_test_connection_verbose_severity_sorting_and_legend(self):
-        """Test that verbose mode sorts nodes by severity and displays legend"""
-        
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = True
-        mock_client.get_cluster_health_summary.return_value = {
-            'cluster_health': 'GREEN', 
-            'green_entities': 100,
-            'yellow_entities': 0,
-            'red_entities': 0,
-            'total_tables': 1, 
-            'total_partitions': 1
-        }
-        
-        # Create nodes with different severity levels for sorting test
-        mock_client.get_nodes_info.return_value = [
-            # Healthy node (should appear last)
-            NodeInfo(id='healthy', name='aaaa-healthy', zone='us-west-2a',
-                    heap_used=1000000000, heap_max=4000000000,  # 25% heap
-                    fs_total=100000000000, fs_used=30000000000, fs_available=70000000000),  # 30% disk
-            
-            # Critical node (should appear first due to severity)
-            NodeInfo(id='critical', name='zzzz-critical', zone='us-west-2b',
-                    heap_used=3800000000, heap_max=4000000000,  # 95% heap
-                    fs_total=100000000000, fs_used=95000000000, fs_available=5000000000),  # 95% disk
-            
-            # Warning node (should appear in middle)
-            NodeInfo(id='warning', name='mmmm-warning', zone='us-west-2c',
-                    heap_used=3200000000, heap_max=4000000000,  # 80% heap
-                    fs_total=100000000000, fs_used=50000000000, fs_available=50000000000),  # 50% disk
-            
-            # Corrupted node (should appear first with highest priority)
-            NodeInfo(id='corrupted', name='bbbb-corrupted', zone='unknown',
-                    heap_used=0, heap_max=1, fs_total=0, fs_used=0, fs_available=0)
-        ]
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
-        
-        cmd.test_connection(verbose=True)
-        output = console.file.getvalue()
-        
-        # Verify legend is displayed (account for potential line breaks)
-        assert "Legend:" in output
-        assert "🔥 Critical (>90% heap)" in output
-        assert "⚠️ Warning (>75% heap)" in output
-        assert "💾 Disk Critical (>90%)" in output
-        assert "📁 Disk Warning (>85%)" in output
-        assert "✅" in output and "Healthy" in output
-        
-        # Verify severity summary is displayed
-        assert "Summary:" in output
-        assert "1 Critical" in output
-        assert "1 Warning" in output
-        assert "1 Healthy" in output
-        assert "1 Corrupted" in output
-        
         # Verify nodes are sorted by severity first (corrupted highest, then critical, warning, healthy)
-        # Find positions of node names in output
-        corrupted_pos = output.find("bbbb-corrupted")
-        critical_pos = output.find("zzzz-critical") 
-        warning_pos = output.find("mmmm-warning")
-        healthy_pos = output.find("aaaa-healthy")
-        
+        positions = [console.first_line_containing(name)
+                     for name in ("bbbb-corrupted", "zzzz-critical", "mmmm-warning", "aaaa-healthy")]
+
         # Ensure all nodes were found
-        assert corrupted_pos != -1
-        assert critical_pos != -1
-        assert warning_pos != -1
-        assert healthy_pos != -1
-        
+        assert -1 not in positions
+
         # Verify sorting: corrupted first, then critical, then warning, then healthy
-        assert corrupted_pos < critical_pos
-        assert critical_pos < warning_pos
-        assert warning_pos < healthy_pos
-        
-        # Verify status indicators
-        assert "🔥" in output  # Critical indicator
-        assert "💾" in output  # Critical disk indicator
-        assert "⚠️" in output  # Warning/corrupted indicators
-        assert "✅" in output  # Healthy indicator
-
-    def test_test_connection_verbose_color_coding_by_severity(self):
-        """Test that verbose mode uses appropriate colors based on severity"""
-        
-        mock_client = Mock(spec=CrateDBClient)
-        mock_client.test_connection.return_value = True
-        mock_client.get_cluster_health_summary.return_value = {
-            'cluster_health': 'GREEN',
-            'green_entities': 100, 
-            'yellow_entities': 0,
-            'red_entities': 0,
-            'total_tables': 1,
-            'total_partitions': 1
-        }
-        
-        # Create nodes with different severities to test color coding
-        mock_client.get_nodes_info.return_value = [
-            # Critical severity node (should be red)
-            NodeInfo(id='critical', name='critical-node', zone='us-west-2a',
-                    heap_used=3800000000, heap_max=4000000000,  # 95% heap
-                    fs_total=100000000000, fs_used=50000000000, fs_available=50000000000),
-            
-            # Warning severity node (should be yellow)
-            NodeInfo(id='warning', name='warning-node', zone='us-west-2b',
-                    heap_used=3200000000, heap_max=4000000000,  # 80% heap
-                    fs_total=100000000000, fs_used=50000000000, fs_available=50000000000),
-            
-            # Healthy node (should be green)
-            NodeInfo(id='healthy', name='healthy-node', zone='us-west-2c',
-                    heap_used=1000000000, heap_max=4000000000,  # 25% heap
-                    fs_total=100000000000, fs_used=30000000000, fs_available=70000000000)
-        ]
-        
-        console = Console(file=StringIO(), width=120, force_terminal=False)
-        cmd = DiagnosticsCommands(mock_client)
-        cmd.console = console
-        
-        cmd.test_connection(verbose=True)
-        output = console.file.getvalue()
-        
-        # Verify appropriate color coding is applied
-        # Note: We can't easily test the actual colors in console output, but we can verify the nodes appear
-        assert "critical-node" in output
-        assert "warning-node" in output
-        assert "healthy-node" in output
\ No newline at end of file
+        assert all(earlier < later for earlier, later in zip(positions, positions[1:]))
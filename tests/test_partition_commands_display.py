@@ -8,27 +8,119 @@ Tests Phase 2 fixes identified in the audit:
 - Error messages include partition context
 """
 
+import os
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from click.testing import CliRunner
+from itertools import groupby
+from operator import itemgetter
+from unittest.mock import Mock
 from rich.table import Table
 from rich.console import Console
-from io import StringIO
 
 from cratedb_xlens.commands.operations import OperationsCommands
-from cratedb_xlens.commands.analysis import AnalysisCommands
 from cratedb_xlens.formatting.tables import RichTableFormatter
-from cratedb_xlens.database import ShardInfo, NodeInfo
+from cratedb_xlens.database import ShardInfo
 from cratedb_xlens.distribution_analyzer import TableDistribution
-from cratedb_xlens.analyzer import ShardAnalyzer
+from cratedb_xlens.analyzer import MoveRecommendation
+from cratedb_xlens.utils import parse_table_partition_identifier
+
+
+def _primary_shard_range(dist):
+    """Return the lowest and highest primary shard count per node of a distribution in one pass"""
+    counts = (metrics['primary_shards'] for metrics in dist.node_distributions.values())
+    lowest = highest = next(counts)
+    for count in counts:
+        if count < lowest:
+            lowest = count
+        elif count > highest:
+            highest = count
+    return lowest, highest
+
+
+def _move_candidates_table():
+    """Empty move candidates table with a partition column"""
+    table = Table(title="Move Candidates")
+    table.add_column("Table")
+    table.add_column("Partition", style="cyan")
+    table.add_column("Shard", justify="right")
+    table.add_column("From Node")
+    table.add_column("To Node")
+    table.add_column("From Zone")
+    table.add_column("To Zone")
+    table.add_column("Size", justify="right")
+    table.add_column("Reason")
+    return table
+
+
+def _distribution_table():
+    """Empty per-partition distribution analysis table"""
+    table = Table(title="Table Distribution Analysis")
+    table.add_column("Table")
+    table.add_column("Partition", style="cyan")
+    table.add_column("Primary Size", justify="right")
+    table.add_column("Balance Status")
+    table.add_column("Risk Level")
+    return table
+
+
+def _mixed_shards_table():
+    """Empty shard table for partitioned and non-partitioned tables side by side"""
+    table = Table()
+    table.add_column("Table")
+    table.add_column("Partition", style="dim")
+    table.add_column("Shard", justify="right")
+    table.add_column("Node")
+    table.add_column("Size", justify="right")
+    return table
+
+
+@pytest.fixture(scope="module")
+def module_console():
+    """Rich console shared by the rendering tests of this module
+
+    Wide enough for the move candidates table, so no column is truncated. The
+    rendered cells carry no markup or emoji codes, and the tests assert on plain
+    text, so markup, emoji and highlighting are turned off. The output is recorded
+    and read back with export_text, so nothing needs to be written to a file.
+    """
+    with open(os.devnull, 'w') as devnull:
+        yield Console(file=devnull, record=True, width=140, force_terminal=False, color_system=None,
+                      markup=False, emoji=False, highlight=False, legacy_windows=False)
+
+
+@pytest.fixture
+def rich_console(module_console):
+    """Hand out the shared Rich console with its recorded output discarded"""
+    module_console.export_text(clear=True)
+    return module_console
+
+
+@pytest.fixture(scope="module")
+def move_candidates_header(module_console):
+    """Rendered text of the empty move candidates table, rendered once per module
+
+    The header is the same for every set of candidates, so tests checking the
+    columns read it from here instead of rendering it again.
+    """
+    module_console.print(_move_candidates_table())
+    return module_console.export_text(clear=True)
+
+
+@pytest.fixture(scope="module")
+def operations_prototype():
+    """Operations command on a mock client, and a mock analyzer, built once per module
+
+    OperationsCommands only creates its ShardAnalyzer inside the commands,
+    so constructing it needs no patching.
+    """
+    return OperationsCommands(Mock()), Mock()
 
 
 class TestPartitionAwareOperationsDisplay:
     """Test that operations commands display partition information"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def partitioned_shards(self):
-        """Sample partitioned shards for display testing"""
+        """Sample partitioned shards for display testing, shared as the tests only read them"""
         return [
             ShardInfo(
                 table_name='logs',
@@ -78,30 +170,25 @@ class TestPartitionAwareOperationsDisplay:
         ]
 
     @pytest.fixture
-    def mock_operations_command(self, partitioned_shards):
-        """Mock operations command with partitioned data"""
-        mock_client = Mock()
-        mock_analyzer = Mock()
+    def mock_operations_command(self, operations_prototype, partitioned_shards):
+        """Mock operations command with partitioned data, reset after every test"""
+        command, mock_analyzer = operations_prototype
         mock_analyzer.shards = partitioned_shards
+        yield command, mock_analyzer
+        mock_analyzer.reset_mock(return_value=True, side_effect=True)
 
-        with patch('cratedb_xlens.commands.operations.ShardAnalyzer') as mock_analyzer_class:
-            mock_analyzer_class.return_value = mock_analyzer
-            command = OperationsCommands(mock_client)
-            return command, mock_analyzer
-
-    def test_list_shards_displays_partition_column(self, mock_operations_command):
+    def test_list_shards_displays_partition_column(self, mock_operations_command, rich_console):
         """Test that list_shards command includes partition column in output"""
         command, mock_analyzer = mock_operations_command
 
         # Capture console output
-        console = Console(file=StringIO(), width=120)
 
         # Test that our table formatter handles partitions
-        formatter = RichTableFormatter(console)
+        formatter = RichTableFormatter(rich_console)
         table = formatter.create_shard_table(mock_analyzer.shards, "Shard Distribution")
 
-        console.print(table)
-        output = console.file.getvalue()
+        rich_console.print(table)
+        output = rich_console.export_text(clear=True)
 
         # Verify partition information is displayed
         assert "Partition" in output
@@ -109,13 +196,13 @@ class TestPartitionAwareOperationsDisplay:
         assert "2024-02" in output
         assert "—" in output  # For non-partitioned table
 
-    def test_show_candidates_includes_partition_context(self, mock_operations_command):
+    def test_show_candidates_includes_partition_context(self, mock_operations_command, move_candidates_header):
         """Test that move candidates display includes partition information"""
         command, mock_analyzer = mock_operations_command
 
-        # Mock move recommendations with partition info
-        mock_recommendations = [
-            Mock(
+        # Move recommendations with partition info
+        recommendations = [
+            MoveRecommendation(
                 table_name='logs',
                 schema_name='events',
                 partition_ident='2024-01',
@@ -126,27 +213,16 @@ class TestPartitionAwareOperationsDisplay:
                 to_zone='zone2',
                 shard_type='PRIMARY',
                 size_gb=5.0,
-                reason='Zone balance optimization',
-                full_table_identifier='events.logs[2024-01]'
+                reason='Zone balance optimization'
             )
         ]
 
-        mock_analyzer.generate_rebalancing_recommendations.return_value = mock_recommendations
+        mock_analyzer.generate_rebalancing_recommendations.return_value = recommendations
 
-        console = Console(file=StringIO(), width=140)
         # Test that move recommendations include partition context
-        table = Table(title="Move Candidates")
-        table.add_column("Table")
-        table.add_column("Partition", style="cyan")  # NEW
-        table.add_column("Shard", justify="right")
-        table.add_column("From Node")
-        table.add_column("To Node")
-        table.add_column("From Zone")
-        table.add_column("To Zone")
-        table.add_column("Size", justify="right")
-        table.add_column("Reason")
-
-        for rec in mock_recommendations:
+        table = _move_candidates_table()
+
+        for rec in recommendations:
             partition_display = rec.partition_ident if rec.partition_ident else "-"
             table.add_row(
                 f"{rec.schema_name}.{rec.table_name}",
@@ -160,21 +236,21 @@ class TestPartitionAwareOperationsDisplay:
                 rec.reason
             )
 
-        console.print(table)
-        output = console.file.getvalue()
-
-        # Verify partition context is shown
-        assert "Partition" in output
-        assert "2024-01" in output
-        assert "events.logs" in output
+        # Verify partition context is shown: the header comes from the cached
+        # render of the empty table, the rows are read from the table's cells
+        table_cells, partition_cells = (list(column.cells) for column in table.columns[:2])
+        assert "Partition" in move_candidates_header
+        assert partition_cells == ["2024-01"]
+        assert table_cells == ["events.logs"]
 
 
 class TestPartitionAwareTableFormatters:
     """Test formatting/tables.py includes partition information"""
 
-    def test_create_shard_table_includes_partition_column(self):
-        """Test that RichTableFormatter.create_shard_table includes partition information"""
-        partitioned_shards = [
+    @pytest.fixture(scope="session")
+    def single_partitioned_shard_pair(self):
+        """A partitioned and a non-partitioned shard, shared as the tests only read them"""
+        return [
             ShardInfo(
                 table_name='logs',
                 schema_name='events',
@@ -207,13 +283,14 @@ class TestPartitionAwareTableFormatters:
             )
         ]
 
+    def test_create_shard_table_includes_partition_column(self, single_partitioned_shard_pair, rich_console):
+        """Test that RichTableFormatter.create_shard_table includes partition information"""
         # Test that our table formatter handles partitions
-        console = Console(file=StringIO(), width=120)
-        formatter = RichTableFormatter(console)
-        table = formatter.create_shard_table(partitioned_shards, "Shard Information")
+        formatter = RichTableFormatter(rich_console)
+        table = formatter.create_shard_table(single_partitioned_shard_pair, "Shard Information")
         
-        console.print(table)
-        output = console.file.getvalue()
+        rich_console.print(table)
+        output = rich_console.export_text(clear=True)
 
         # Should show partition information properly formatted
         assert "2024-Q1" in output
@@ -221,63 +298,60 @@ class TestPartitionAwareTableFormatters:
         # Non-partitioned should show "—"
         assert "—" in output
 
-    def test_format_shard_info_includes_partition(self):
+    @pytest.mark.parametrize('shard, expected', [
+        pytest.param(
+            ShardInfo(
+                table_name='metrics',
+                schema_name='timeseries',
+                shard_id=5,
+                node_id='data-node-3-id',
+                node_name='data-node-3',
+                zone='zone-west',
+                is_primary=True,
+                size_bytes=13421772800,
+                size_gb=12.5,
+                num_docs=2500000,
+                state='STARTED',
+                routing_state='STARTED',
+                partition_ident='2024-01-15'
+            ),
+            "timeseries.metrics[2024-01-15] shard 5",
+            id='partitioned'),
+        pytest.param(
+            ShardInfo(
+                table_name='simple',
+                schema_name='doc',
+                shard_id=0,
+                node_id='node1-id',
+                node_name='node1',
+                zone='zone1',
+                is_primary=True,
+                size_bytes=1073741824,
+                size_gb=1.0,
+                num_docs=200000,
+                state='STARTED',
+                routing_state='STARTED',
+                partition_ident=None
+            ),
+            "doc.simple shard 0",
+            id='non-partitioned'),
+    ])
+    def test_format_shard_info_includes_partition(self, shard, expected):
         """Test shard info formatting includes partition context"""
-        partitioned_shard = ShardInfo(
-            table_name='metrics',
-            schema_name='timeseries',
-            shard_id=5,
-            node_id='data-node-3-id',
-            node_name='data-node-3',
-            zone='zone-west',
-            is_primary=True,
-            size_bytes=13421772800,
-            size_gb=12.5,
-            num_docs=2500000,
-            state='STARTED',
-            routing_state='STARTED',
-            partition_ident='2024-01-15'
-        )
-
-        # Test formatting that includes partition
-        formatted = f"{partitioned_shard.schema_name}.{partitioned_shard.table_name}"
-        if partitioned_shard.partition_ident:
-            formatted += f"[{partitioned_shard.partition_ident}]"
-        formatted += f" shard {partitioned_shard.shard_id}"
+        formatted = f"{shard.schema_name}.{shard.table_name}"
+        if shard.partition_ident:
+            formatted += f"[{shard.partition_ident}]"
+        formatted += f" shard {shard.shard_id}"
 
-        assert formatted == "timeseries.metrics[2024-01-15] shard 5"
-
-        # Test non-partitioned
-        non_partitioned = ShardInfo(
-            table_name='simple',
-            schema_name='doc',
-            shard_id=0,
-            node_id='node1-id',
-            node_name='node1',
-            zone='zone1',
-            is_primary=True,
-            size_bytes=1073741824,
-            size_gb=1.0,
-            num_docs=200000,
-            state='STARTED',
-            routing_state='STARTED',
-            partition_ident=None
-        )
-
-        formatted_simple = f"{non_partitioned.schema_name}.{non_partitioned.table_name}"
-        if non_partitioned.partition_ident:
-            formatted_simple += f"[{non_partitioned.partition_ident}]"
-        formatted_simple += f" shard {non_partitioned.shard_id}"
-
-        assert formatted_simple == "doc.simple shard 0"
+        assert formatted == expected
 
 
 class TestPartitionAwareAnalysisCommands:
     """Test analysis commands show partition context"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def partitioned_distributions(self):
-        """Sample partition distributions for testing"""
+        """Sample partition distributions for testing, shared as the tests only read them"""
         return [
             TableDistribution(
                 schema_name='events',
@@ -301,23 +375,15 @@ class TestPartitionAwareAnalysisCommands:
             )
         ]
 
-    def test_analyze_distribution_shows_partition_breakdown(self, partitioned_distributions):
+    def test_analyze_distribution_shows_partition_breakdown(self, partitioned_distributions, rich_console):
         """Test that analyze distribution shows per-partition breakdown"""
-        console = Console(file=StringIO(), width=140)
 
         # Create table showing distribution per partition
-        table = Table(title="Table Distribution Analysis")
-        table.add_column("Table")
-        table.add_column("Partition", style="cyan")
-        table.add_column("Primary Size", justify="right")
-        table.add_column("Balance Status")
-        table.add_column("Risk Level")
+        table = _distribution_table()
 
         for dist in partitioned_distributions:
             # Analyze balance for this partition
-            node_counts = [metrics['primary_shards'] for metrics in dist.node_distributions.values()]
-            max_shards = max(node_counts)
-            min_shards = min(node_counts)
+            min_shards, max_shards = _primary_shard_range(dist)
 
             if min_shards == 0 and max_shards > 0:
                 balance_status = "🚨 CRITICAL IMBALANCE"
@@ -337,8 +403,8 @@ class TestPartitionAwareAnalysisCommands:
                 risk_level
             )
 
-        console.print(table)
-        output = console.file.getvalue()
+        rich_console.print(table)
+        output = rich_console.export_text(clear=True)
 
         # Should show per-partition analysis
         assert "2024-01" in output
@@ -351,30 +417,28 @@ class TestPartitionAwareAnalysisCommands:
 
     def test_health_report_partition_context(self, partitioned_distributions):
         """Test health reports include partition context in warnings"""
-        console = Console(file=StringIO(), width=120)
 
-        # Simulate health report that shows partition-specific issues
+        # Simulate health report that shows partition-specific issues, as plain text
+        lines = []
         for dist in partitioned_distributions:
-            node_counts = [metrics['primary_shards'] for metrics in dist.node_distributions.values()]
-            max_shards = max(node_counts)
-            min_shards = min(node_counts)
+            min_shards, max_shards = _primary_shard_range(dist)
 
             if min_shards == 0:
-                console.print(
-                    f"[red]WARNING[/red]: {dist.full_table_name} has severe imbalance "
+                lines.append(
+                    f"WARNING: {dist.full_table_name} has severe imbalance "
                     f"(max: {max_shards}, min: {min_shards} shards per node)"
                 )
             elif max_shards - min_shards > 1:
-                console.print(
-                    f"[yellow]NOTICE[/yellow]: {dist.full_table_name} has minor imbalance "
+                lines.append(
+                    f"NOTICE: {dist.full_table_name} has minor imbalance "
                     f"(max: {max_shards}, min: {min_shards} shards per node)"
                 )
             else:
-                console.print(
-                    f"[green]OK[/green]: {dist.full_table_name} is well balanced"
+                lines.append(
+                    f"OK: {dist.full_table_name} is well balanced"
                 )
 
-        output = console.file.getvalue()
+        output = "\n".join(lines)
 
         # Should include partition identifiers in warnings
         assert "events.logs[2024-01]" in output
@@ -415,17 +479,16 @@ class TestPartitionErrorMessages:
             }
         ]
 
-        console = Console(file=StringIO(), width=120)
-
+        lines = []
         for violation in violations:
-            console.print(
-                f"[red]{violation['severity']}[/red]: "
+            lines.append(
+                f"{violation['severity']}: "
                 f"Table {violation['table']} partition [{violation['partition']}] - "
                 f"{violation['description']}"
             )
-            console.print(f"  💡 {violation['recommendation']}")
+            lines.append(f"  💡 {violation['recommendation']}")
 
-        output = console.file.getvalue()
+        output = "\n".join(lines)
 
         # Should clearly identify which partition has the violation
         assert "events.logs partition [2024-01]" in output
@@ -436,27 +499,16 @@ class TestPartitionErrorMessages:
 class TestPartitionCommandParsing:
     """Test command line parsing for partition-specific operations"""
 
-    def test_parse_table_partition_syntax(self):
+    @pytest.mark.parametrize('identifier, expected', [
+        ("events.logs[2024-01]", ("events.logs", "2024-01")),
+        ("logs[Q1-2024]", ("logs", "Q1-2024")),
+        ("simple_table", ("simple_table", None)),
+        ("schema.table", ("schema.table", None)),
+        ("complex.table[part_2024_01_15]", ("complex.table", "part_2024_01_15")),
+    ])
+    def test_parse_table_partition_syntax(self, identifier, expected):
         """Test parsing table[partition] syntax"""
-        test_cases = [
-            ("events.logs[2024-01]", ("events.logs", "2024-01")),
-            ("logs[Q1-2024]", ("logs", "Q1-2024")),
-            ("simple_table", ("simple_table", None)),
-            ("schema.table", ("schema.table", None)),
-            ("complex.table[part_2024_01_15]", ("complex.table", "part_2024_01_15"))
-        ]
-
-        def parse_table_partition(identifier):
-            """Parse table[partition] syntax"""
-            if '[' in identifier and identifier.endswith(']'):
-                table_part, partition_part = identifier.rsplit('[', 1)
-                partition_ident = partition_part.rstrip(']')
-                return table_part, partition_ident
-            return identifier, None
-
-        for input_str, expected in test_cases:
-            result = parse_table_partition(input_str)
-            assert result == expected, f"Failed for input: {input_str}"
+        assert parse_table_partition_identifier(identifier) == expected
 
     def test_partition_filtering_in_commands(self):
         """Test that commands can filter by specific partitions"""
@@ -493,9 +545,10 @@ class TestPartitionCommandParsing:
 class TestPartitionDisplayBackwardCompatibility:
     """Ensure partition displays work with non-partitioned tables"""
 
-    def test_mixed_partitioned_non_partitioned_display(self):
-        """Test display of mixed partitioned and non-partitioned tables"""
-        mixed_shards = [
+    @pytest.fixture(scope="session")
+    def mixed_shards(self):
+        """Shards of a partitioned and a non-partitioned table, shared as the tests only read them"""
+        return [
             ShardInfo(
                 table_name='logs',
                 schema_name='events',
@@ -528,13 +581,9 @@ class TestPartitionDisplayBackwardCompatibility:
             )
         ]
 
-        console = Console(file=StringIO(), width=120)
-        table = Table()
-        table.add_column("Table")
-        table.add_column("Partition", style="dim")
-        table.add_column("Shard", justify="right")
-        table.add_column("Node")
-        table.add_column("Size", justify="right")
+    def test_mixed_partitioned_non_partitioned_display(self, mixed_shards, rich_console):
+        """Test display of mixed partitioned and non-partitioned tables"""
+        table = _mixed_shards_table()
 
         for shard in mixed_shards:
             partition_display = shard.partition_ident if shard.partition_ident else "—"
@@ -548,8 +597,8 @@ class TestPartitionDisplayBackwardCompatibility:
                 f"{shard.size_gb:.1f}GB"
             )
 
-        console.print(table)
-        output = console.file.getvalue()
+        rich_console.print(table)
+        output = rich_console.export_text(clear=True)
 
         # Both partitioned and non-partitioned should display correctly
         assert "events.logs" in output
@@ -557,50 +606,44 @@ class TestPartitionDisplayBackwardCompatibility:
         assert "2024-01" in output  # Partitioned
         assert "—" in output  # Non-partitioned placeholder
 
-    def test_empty_partition_handling(self):
+    @pytest.mark.parametrize('partition_value', [
+        pytest.param(None, id='null'),
+        pytest.param("", id='empty'),
+        pytest.param(" ", id='whitespace'),
+    ])
+    def test_empty_partition_handling(self, partition_value):
         """Test handling of empty/null partition identifiers"""
-        edge_cases = [
-            None,  # Null partition
-            "",    # Empty string
-            " ",   # Whitespace
-        ]
-
-        for partition_value in edge_cases:
-            shard = ShardInfo(
-                table_name='table',
-                schema_name='test',
-                shard_id=0,
-                node_id='node1-id',
-                node_name='node1',
-                zone='zone1',
-                is_primary=True,
-                size_bytes=1073741824,
-                size_gb=1.0,
-                num_docs=200000,
-                state='STARTED',
-                routing_state='STARTED',
-                partition_ident=partition_value
-            )
+        shard = ShardInfo(
+            table_name='table',
+            schema_name='test',
+            shard_id=0,
+            node_id='node1-id',
+            node_name='node1',
+            zone='zone1',
+            is_primary=True,
+            size_bytes=1073741824,
+            size_gb=1.0,
+            num_docs=200000,
+            state='STARTED',
+            routing_state='STARTED',
+            partition_ident=partition_value
+        )
 
-            # Should display consistently as non-partitioned
-            partition_display = shard.partition_ident if shard.partition_ident and shard.partition_ident.strip() else "—"
-            assert partition_display == "—"
+        # Should display consistently as non-partitioned
+        partition_display = shard.partition_ident if shard.partition_ident and shard.partition_ident.strip() else "—"
+        assert partition_display == "—"
 
 
 @pytest.mark.integration
 class TestPartitionDisplayIntegration:
     """Integration tests for partition display functionality"""
 
-    def test_end_to_end_partition_display_flow(self):
-        """Test complete flow from data to display with partitions"""
-        # This would test the full pipeline:
+    @pytest.fixture(scope="module")
+    def e2e_distributions(self):
+        """Distributions parsed from a partition-aware query result, built once per module"""
+        # This covers the first steps of the full pipeline:
         # 1. Query returns partition data
         # 2. Data models handle partitions
-        # 3. Analysis considers partitions separately
-        # 4. Display shows partition context
-        # 5. User can identify partition-specific issues
-
-        # Mock the complete flow
         query_result = {
             'rows': [
                 # 2024-01 partition: Severely imbalanced (all shards on node1)
@@ -612,50 +655,40 @@ class TestPartitionDisplayIntegration:
             ]
         }
 
-        # Parse into distributions
-        partitions = {}
-        for row in query_result['rows']:
-            partition_key = row[2]
-            if partition_key not in partitions:
-                partitions[partition_key] = {
-                    'schema_name': row[0],
-                    'table_name': row[1],
-                    'partition_ident': row[2],
-                    'nodes': {}
-                }
-            partitions[partition_key]['nodes'][row[3]] = {
-                'primary_shards': row[4],
-                'primary_size_gb': row[7]
-            }
-
-        # Create distributions
+        # Parse into one distribution per partition, grouping the rows in a single pass
         distributions = []
-        for p_data in partitions.values():
-            total_size = sum(n['primary_size_gb'] for n in p_data['nodes'].values())
-            dist = TableDistribution(
-                schema_name=p_data['schema_name'],
-                table_name=p_data['table_name'],
-                partition_ident=p_data['partition_ident'],
-                total_primary_size_gb=total_size,
-                node_distributions=p_data['nodes']
-            )
-            distributions.append(dist)
-
-        # Verify we can identify partition-specific issues
+        rows = sorted(query_result['rows'], key=itemgetter(2))
+        for partition_ident, group in groupby(rows, key=itemgetter(2)):
+            group = list(group)
+            node_distributions = {
+                row[3]: {'primary_shards': row[4], 'primary_size_gb': row[7]} for row in group
+            }
+            distributions.append(TableDistribution(
+                schema_name=group[0][0],
+                table_name=group[0][1],
+                partition_ident=partition_ident,
+                total_primary_size_gb=sum(row[7] for row in group),
+                node_distributions=node_distributions
+            ))
+        return distributions
+
+    def test_e2e_imbalance_detection(self, e2e_distributions):
+        """Test that analysis considers partitions separately and spots the imbalanced one"""
         imbalanced_partitions = []
-        for dist in distributions:
-            node_shards = [n['primary_shards'] for n in dist.node_distributions.values()]
-            if min(node_shards) == 0:  # Severe imbalance
+        for dist in e2e_distributions:
+            min_shards, _ = _primary_shard_range(dist)
+            if min_shards == 0:  # Severe imbalance
                 imbalanced_partitions.append(dist.partition_ident)
 
         # Should detect 2024-01 as imbalanced
         assert '2024-01' in imbalanced_partitions
         assert '2024-02' not in imbalanced_partitions  # This one is balanced
 
-        # Verify display would show partition context
-        for dist in distributions:
-            display_name = dist.full_table_name
-            if dist.partition_ident == '2024-01':
-                assert display_name == 'events.logs[2024-01]'
-            elif dist.partition_ident == '2024-02':
-                assert display_name == 'events.logs[2024-02]'
+    def test_e2e_display_name_format(self, e2e_distributions):
+        """Test that the display shows the partition context of each distribution"""
+        display_names = {dist.partition_ident: dist.full_table_name for dist in e2e_distributions}
+
+        assert display_names == {
+            '2024-01': 'events.logs[2024-01]',
+            '2024-02': 'events.logs[2024-02]',
+        }